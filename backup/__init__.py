@@ -1,2 +1,2 @@
 from .worker import BackupWorker
-from .engines import iter_files_under, count_total_files, is_unchanged
+from .engines import iter_files_under, is_unchanged, copy_file
@@ -0,0 +1,134 @@
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+try:
+    import deflate  # libdeflate bindings: faster whole-buffer DEFLATE than zlib at the same ratio
+except ImportError:  # optional: zlib is used when missing
+    deflate = None
+
+# Already-compressed formats: deflating them burns CPU for no gain (often a small loss)
+INCOMPRESSIBLE = {".pak", ".png", ".jpg", ".jpeg", ".jfif", ".zip", ".7z", ".gz", ".mp3", ".ogg", ".mp4", ".webm",
+                  ".bk2", ".bnk", ".wem"}
+SNIFF_BYTES = 4096
+SNIFF_RATIO = 0.95
+COPY_CHUNK = 1024 * 1024  # raw entry copies from the previous archive go through in 1 MiB pieces
+
+# libdeflate's CRC-32 is carry-less-multiply accelerated; zlib's is table-driven
+crc32 = deflate.crc32 if deflate is not None else zlib.crc32
+
+def compress_type_for(name, head=b""):
+    """ZIP_STORED for known-compressed extensions or when a fast deflate of the first 4 KiB barely shrinks it."""
+    if os.path.splitext(name)[1].lower() in INCOMPRESSIBLE:
+        return zipfile.ZIP_STORED
+    head = head[:SNIFF_BYTES]
+    if len(head) >= 256 and len(zlib.compress(head, 1)) > SNIFF_RATIO * len(head):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def make_zipinfo(arcname, st, compress_type=zipfile.ZIP_DEFLATED):
+    zi = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+    zi.external_attr = (st.st_mode & 0xFFFF) << 16
+    zi.file_size = st.st_size
+    zi.compress_type = compress_type
+    return zi
+
+def deflate_raw(data, level=-1):
+    # raw DEFLATE stream (no zlib header), as stored in ZIP entries
+    if deflate is not None:
+        return deflate.deflate_compress(data, 6 if level < 0 else level)
+    c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+def compress_files(paths, level=-1):
+    """
+    Process-pool task: read and compress a batch of files. Returns one
+    (compress_type, crc32, size, payload, error) tuple per path, in order.
+    """
+    out = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            ctype = compress_type_for(path, data)
+            payload = deflate_raw(data, level) if ctype == zipfile.ZIP_DEFLATED else data
+            out.append((ctype, crc32(data), len(data), payload, None))
+        except Exception as e:
+            out.append((None, 0, 0, None, e))
+    return out
+
+def _begin_entry(zf, zi, crc, file_size, compress_size):
+    # caller holds zf._lock: local header for zi at the end of the entries written so far
+    zi.CRC = crc; zi.file_size = file_size; zi.compress_size = compress_size
+    zi.flag_bits = 0
+    if not zi.external_attr:
+        zi.external_attr = 0o600 << 16
+    zip64 = file_size > zipfile.ZIP64_LIMIT or compress_size > zipfile.ZIP64_LIMIT
+    zf._writecheck(zi)
+    # seeking a BufferedWriter flushes it; entries are appended back to back, so skip the no-op seek
+    if zf.fp.tell() != zf.start_dir: zf.fp.seek(zf.start_dir)
+    zi.header_offset = zf.start_dir
+    zf._didModify = True
+    zf.fp.write(zi.FileHeader(zip64))
+
+def _end_entry(zf, zi):
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zi)
+    zf.NameToInfo[zi.filename] = zi
+
+def write_raw_entry(zf, zi, crc, file_size, payload):
+    """
+    Append an entry whose payload is already in its final (stored or raw
+    deflate) form. Mirrors what ZipFile.open(..., 'w') does, minus the
+    compression, so the archive's central directory stays managed by zf.
+    """
+    with zf._lock:
+        _begin_entry(zf, zi, crc, file_size, len(payload))
+        zf.fp.write(payload)
+        _end_entry(zf, zi)
+
+def copy_raw_entry(src_zf, src_zi, zf, zi):
+    """
+    Copy src_zi's payload, still compressed, from an archive opened for
+    reading into zf as zi, COPY_CHUNK bytes at a time. The payload is
+    inflated on the way through and checked against src_zi's CRC-32 and size;
+    on a mismatch the partial entry is cut off again and BadZipFile raised.
+    """
+    if src_zi.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or src_zi.flag_bits & 0x1:
+        raise zipfile.BadZipFile(f"Can't copy {src_zi.filename} raw")
+    check = zlib.decompressobj(-15) if src_zi.compress_type == zipfile.ZIP_DEFLATED else None
+    crc = 0; size = 0
+    with src_zf._lock, zf._lock:
+        src_zf.fp.seek(src_zi.header_offset)
+        fh = src_zf.fp.read(zipfile.sizeFileHeader)
+        if len(fh) != zipfile.sizeFileHeader or fh[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local header for {src_zi.filename}")
+        fh = struct.unpack(zipfile.structFileHeader, fh)
+        src_zf.fp.seek(fh[10] + fh[11], os.SEEK_CUR)  # skip file name + extra field
+        zi.compress_type = src_zi.compress_type
+        _begin_entry(zf, zi, src_zi.CRC, src_zi.file_size, src_zi.compress_size)
+        try:
+            left = src_zi.compress_size
+            while left:
+                chunk = src_zf.fp.read(min(COPY_CHUNK, left))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"Truncated entry {src_zi.filename}")
+                left -= len(chunk)
+                zf.fp.write(chunk)
+                while chunk:
+                    # max_length keeps a highly compressed chunk from inflating all at once
+                    data = chunk if check is None else check.decompress(chunk, COPY_CHUNK)
+                    crc = crc32(data, crc); size += len(data)
+                    chunk = b"" if check is None else check.unconsumed_tail
+            if check is not None:
+                data = check.flush(); crc = crc32(data, crc); size += len(data)
+            if crc != src_zi.CRC or size != src_zi.file_size or (check is not None and not check.eof):
+                raise zipfile.BadZipFile(f"Bad CRC-32 for {src_zi.filename}")
+        except (OSError, zlib.error, zipfile.BadZipFile) as e:
+            zf.fp.seek(zi.header_offset); zf.fp.truncate()
+            if isinstance(e, zlib.error):
+                raise zipfile.BadZipFile(f"Bad compressed data for {src_zi.filename}: {e}") from e
+            raise
+        _end_entry(zf, zi)
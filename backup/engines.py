@@ -1,27 +1,190 @@
+import errno
+import mmap
 import os
+import queue
+import stat
+import sys
+import threading
 
-def iter_files_under(root_dir):
-    for base, dirs, files in os.walk(root_dir):
-        for f in files:
-            src = os.path.join(base, f)
-            rel = os.path.relpath(src, root_dir)
-            yield src, rel
-
-def count_total_files(existing_sources):
-    total = 0
-    for s in existing_sources:
-        for _ in iter_files_under(s):
-            total += 1
-    return total
-
-def is_unchanged(src_file, dst_file, mtime_slop=1.0):
+from windows import copy_file_ex
+
+COPY_BUFSIZE = 4 * 1024 * 1024  # 4 MiB chunks: few large syscalls per file
+MMAP_MIN_SIZE = 8 * 1024 * 1024  # above this the fallback copy maps the source instead
+PREALLOC_MIN_SIZE = 256 * 1024  # reserve the full extent up front for files at least this big
+
+_tls = threading.local()
+
+_HAS_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+_HAS_FALLOCATE = hasattr(os, "posix_fallocate")
+# file-to-file sendfile is Linux-only (macOS/BSD need a socket as the target)
+_HAS_SENDFILE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+# copy_file_range refusing this pair of files (cross-device on old kernels,
+# unsupported filesystem...): fall back to the buffered loop
+_NO_FAST_COPY = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ETXTBSY, errno.EPERM}
+
+def _copy_buffer():
+    buf = getattr(_tls, "buf", None)
+    if buf is None:
+        buf = _tls.buf = bytearray(COPY_BUFSIZE)
+    return buf
+
+def iter_files_under(root_dir, sep=os.sep):
+    """
+    Yield (src_path, rel_dir, name, entry) for every file below root_dir;
+    rel_dir is the containing directory relative to root_dir, joined with and
+    ending in sep ("" at the top; "/" gives archive member names directly),
+    so rel_dir + name is the relative path and callers can derive per-directory
+    values once per rel_dir rather than splitting every path. entry is the
+    os.DirEntry: its stat() is cached (and free on Windows, where it comes
+    from the directory listing), and elsewhere it is only paid by consumers
+    that need it, on their own threads. Like os.walk, unreadable directories
+    are skipped and directory symlinks not followed.
+    """
+    stack = [(root_dir, "")]
+    while stack:
+        dir_path, rel_base = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir():
+                    if not e.is_symlink(): stack.append((e.path, rel_base + e.name + sep))
+                    continue
+                yield e.path, rel_base, e.name, e
+
+class SourceScan(threading.Thread):
+    """
+    Single background walk over all sources. Consumers iterate files(i) for
+    roots[i] while the walk is still running; count is the number of files
+    found so far and finished is set once every root has been walked.
+    """
+    def __init__(self, roots, sep=os.sep):
+        super().__init__(daemon=True)
+        self.roots = roots
+        self.sep = sep
+        self.count = 0
+        self.finished = threading.Event()
+        self._queues = [queue.SimpleQueue() for _ in roots]
+        self._stopped = False
+
+    def run(self):
+        i = 0
+        try:
+            for i, root in enumerate(self.roots):
+                q = self._queues[i]
+                for entry in iter_files_under(root, self.sep):
+                    if self._stopped: return
+                    q.put(entry); self.count += 1
+                q.put(None)
+            i = len(self.roots)
+        finally:
+            for q in self._queues[i:]: q.put(None)
+            self.finished.set()
+
+    def files(self, i):
+        q = self._queues[i]
+        while True:
+            entry = q.get()
+            if entry is None: return
+            yield entry
+
+    def stop(self):
+        self._stopped = True
+
+def is_unchanged(src_file, dst_file, mtime_slop=1.0, src_stat=None):
+    """
+    Size + mtime (within mtime_slop) match.
+    src_stat may be a stat result or the source's os.DirEntry (cached stat).
+    """
     try:
-        if not os.path.exists(dst_file):
+        try:
+            d_stat = os.stat(dst_file)
+        except FileNotFoundError:
             return False
-        s_stat = os.stat(src_file)
-        d_stat = os.stat(dst_file)
+        if src_stat is None:
+            s_stat = os.stat(src_file)
+        else:
+            s_stat = src_stat.stat() if isinstance(src_stat, os.DirEntry) else src_stat
         if s_stat.st_size != d_stat.st_size:
             return False
-        return abs(s_stat.st_mtime - d_stat.st_mtime) <= mtime_slop
+        return abs(s_stat.st_mtime_ns - d_stat.st_mtime_ns) <= int(mtime_slop * 1_000_000_000)
     except Exception:
         return False
+
+def _copy_range(infd, outfd):
+    copied = 0
+    while True:
+        try:
+            n = os.copy_file_range(infd, outfd, 1 << 30)
+        except OSError as e:
+            if copied == 0 and e.errno in _NO_FAST_COPY:
+                return False
+            raise
+        if not n: return True
+        copied += n
+
+def _copy_sendfile(infd, outfd):
+    # in-kernel too; still works where copy_file_range refuses (cross-filesystem on pre-5.3 kernels)
+    offset = 0
+    while True:
+        try:
+            n = os.sendfile(outfd, infd, offset, 1 << 30)
+        except OSError as e:
+            if offset == 0 and e.errno in _NO_FAST_COPY:
+                return False
+            raise
+        if not n: return True
+        offset += n
+
+def _copy_mapped(sf, df):
+    # kernel pages the source in on demand (read-ahead hinted); no userspace copy buffer
+    with mmap.mmap(sf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, "madvise"): mm.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mm); size = len(mm)
+        try:
+            pos = 0
+            while pos < size:
+                pos += df.write(view[pos:pos + COPY_BUFSIZE * 4])
+        finally:
+            view.release()
+
+def _copy_buffered(sf, df):
+    buf = _copy_buffer(); view = memoryview(buf)
+    while True:
+        n = sf.readinto(buf)
+        if not n: break
+        pos = 0
+        while pos < n:
+            pos += df.write(view[pos:n])
+
+def copy_file(src_file, dst_file):
+    """
+    Copy src -> dst keeping timestamps and mode. Windows uses CopyFileExW and
+    Linux copy_file_range (or sendfile), so the data never passes through
+    Python; elsewhere (or if the kernel refuses) large files are copied from
+    an mmap of the source and small ones through a reused 4 MiB buffer.
+    """
+    if sys.platform == "win32":
+        copy_file_ex(src_file, dst_file); return
+    with open(src_file, "rb", buffering=0) as sf, open(dst_file, "wb", buffering=0) as df:
+        st = os.fstat(sf.fileno())
+        prealloc = _HAS_FALLOCATE and st.st_size >= PREALLOC_MIN_SIZE
+        if prealloc:
+            try:
+                os.posix_fallocate(df.fileno(), 0, st.st_size)
+            except OSError:
+                prealloc = False  # filesystem can't preallocate; the copy just extends as it goes
+        infd, outfd = sf.fileno(), df.fileno()
+        if not (_HAS_COPY_FILE_RANGE and _copy_range(infd, outfd)
+                or _HAS_SENDFILE and _copy_sendfile(infd, outfd)):
+            if st.st_size >= MMAP_MIN_SIZE:
+                _copy_mapped(sf, df)
+            else:
+                _copy_buffered(sf, df)
+        if prealloc:
+            # fallocate set the size from the fstat above: if the source shrank meanwhile, cut the zero tail
+            os.ftruncate(outfd, os.lseek(outfd, 0, os.SEEK_CUR))
+        os.chmod(outfd, stat.S_IMODE(st.st_mode))
+    os.utime(dst_file, ns=(st.st_atime_ns, st.st_mtime_ns))
@@ -1,38 +1,131 @@
+import io
+import multiprocessing
 import os
-import shutil
+import queue
+import tarfile
 import threading
+import time
 import traceback
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
+from itertools import islice, repeat
 
-from backup.engines import iter_files_under, count_total_files, is_unchanged
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .tar.zst output
+    zstandard = None
+
+from backup.archive import (
+    SNIFF_BYTES, compress_files, compress_type_for, copy_raw_entry, make_zipinfo, write_raw_entry
+)
+from backup.engines import SourceScan, is_unchanged, copy_file
 from windows import win_longpath
 
+# ZIP: files are read + compressed in worker processes, in batches of ~8 MiB /
+# 512 files so per-task overhead stays small but every core gets work;
+# files over 64 MiB are streamed by the writer instead of buffered
+ZIP_BATCH_BYTES = 8 * 1024 * 1024
+ZIP_BATCH_FILES = 512
+ZIP_BUFFER_MAX = 64 * 1024 * 1024
+ZIP_IN_FLIGHT_BYTES = 512 * 1024 * 1024  # source bytes submitted but not yet written, in ZIP_BATCH_BYTES units
+ZIP_MAX_WORKERS = 61  # ProcessPoolExecutor's limit on Windows (WaitForMultipleObjects)
+ZIP_MAX_IN_FLIGHT = 64  # batches queued for the writer, whatever the core count (bytes are capped by ZIP_IN_FLIGHT_BYTES)
+ZIP_WRITE_BUFFER = 1024 * 1024  # archive writes go out in 1 MiB blocks (small writes are slow on FAT/exFAT sticks)
+
+STAT_WORKERS = 16  # incremental checks are stat-latency bound (USB); overlap them
+STAT_CHUNK = 512
+COPY_WINDOW = 32  # mirror: copies submitted to the pool but not yet logged
+MIRROR_LOG_LINES = 4096  # mirror: backup_log.txt lines gathered per write
+
+ZSTD_LEVEL = 3
+
+# UI traffic: at most ~10 progress updates/s, log lines shipped in batches
+PROGRESS_INTERVAL = 0.1
+LOG_BATCH_LINES = 32
+LOG_FLUSH_SECS = 0.1
+
+def _tagged_base(src_root):
+    parent = os.path.basename(os.path.dirname(src_root)); leaf = os.path.basename(src_root)
+    return f"{parent}__{leaf}" if parent else leaf
+
 class BackupWorker(threading.Thread):
     """
     Background backup worker:
-      - zip_mode: write a single ZIP archive
-      - else: mirror to a folder (optional incremental)
-    Emits UI updates via ui_queue: ('log'| 'progress' | 'done' | 'failed' | 'cancelled', payload)
+      - zip_mode: write a single ZIP archive (or .tar.zst when compression="zstd"); incremental ZIP
+        copies unchanged files' compressed entries from the archive named in manifest, and
+        leaves the manifest for this archive in new_manifest
+      - else: mirror to a folder (optional incremental), max_parallel_copies files at a time
+    Emits UI updates by appending to ui_queue (a deque): ('log_batch'| 'progress' | 'done' | 'failed' | 'cancelled', payload);
+    a progress total of 0 means the total is not known yet. notify(), if given, is called
+    after each message is queued so the UI can drain at once instead of on its next poll.
     """
-    def __init__(self, sources, dest_root, ui_queue, zip_mode=False, incremental=True):
+    def __init__(self, sources, dest_root, ui_queue, zip_mode=False, incremental=True, compression="deflate",
+                 zip_level=3, max_parallel_copies=4, expected_total=0, manifest=None,
+                 notify=None):
         super().__init__(daemon=True)
         self.sources = sources
         self.dest_root = dest_root
         self.ui_queue = ui_queue
+        self.notify = notify
         self.zip_mode = zip_mode
-        self.incremental = incremental if not zip_mode else False
-        self.stop_flag = False
+        self.compression = compression if zip_mode else "deflate"
+        self.zip_level = zip_level
+        self.incremental = incremental if self.compression != "zstd" else False
+        self.max_parallel_copies = max(1, int(max_parallel_copies))
+        self.expected_total = expected_total  # progress estimate until the scan finishes (last run's count)
+        self.manifest = manifest or {}
+        self.new_manifest = None
+        self._prev_files = {}
+        self.total_files = 0
+        self.scan = None
+        self.stop_event = threading.Event()  # set by the UI to cancel
         self.errors = []
+        self._log_lock = threading.Lock()
+        self._log_buf = []
+        self._last_log_flush = 0.0
+        self._last_progress_ts = 0.0
+
+    def _post(self, msg_type, payload):
+        self.ui_queue.append((msg_type, payload))
+        if self.notify: self.notify()
+
+    def log(self, msg):
+        with self._log_lock:
+            self._log_buf.append(msg)
+            if len(self._log_buf) < LOG_BATCH_LINES and time.monotonic() - self._last_log_flush < LOG_FLUSH_SECS:
+                return
+        self._flush_log()
+
+    def _flush_log(self):
+        with self._log_lock:
+            lines, self._log_buf = self._log_buf, []
+            self._last_log_flush = time.monotonic()
+        if lines: self._post("log_batch", lines)  # outside the lock: notify may block on the UI thread
+
+    def set_progress(self, done, total, final=False):
+        now = time.monotonic()
+        if not final and (done < total or not total) and now - self._last_progress_ts < PROGRESS_INTERVAL: return
+        self._last_progress_ts = now
+        self._flush_log()
+        self._post("progress", (done, total))
 
-    def log(self, msg): self.ui_queue.put(("log", msg))
-    def set_progress(self, done, total): self.ui_queue.put(("progress", (done, total)))
+    def _progress(self, done):
+        scan = self.scan
+        if scan.finished.is_set():
+            total = max(scan.count, done, 1)
+        elif self.expected_total:
+            total = max(self.expected_total, scan.count, done)
+        else:
+            total = 0  # no estimate (first run): the UI shows an indeterminate bar until the scan finishes
+        self.set_progress(done, total)
 
     def _mk_backup_target(self):
         computer = os.environ.get("COMPUTERNAME", "UNKNOWNPC")
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         if self.zip_mode:
-            return os.path.join(self.dest_root, f"EliteDangerousBackup_{computer}_{ts}.zip")
+            ext = ".tar.zst" if self.compression == "zstd" else ".zip"
+            return os.path.join(self.dest_root, f"EliteDangerousBackup_{computer}_{ts}{ext}")
         else:
             dst = os.path.join(self.dest_root, f"EliteDangerousBackup_{computer}_{ts}")
             os.makedirs(dst, exist_ok=True)
@@ -44,78 +137,330 @@ class BackupWorker(threading.Thread):
             missing = [s for s in self.sources if not s or not os.path.isdir(s)]
             for m in missing: self.log(f"[WARN] Source not found or unset (skipping): {m}")
 
-            total_files = count_total_files(existing)
-            self.set_progress(0, max(total_files, 1))
-            target = self._mk_backup_target()
+            if self.compression == "zstd" and zstandard is None:
+                self.log("[WARN] zstandard module not installed; writing a ZIP archive instead.")
+                self.compression = "deflate"
 
-            if self.zip_mode:
-                self._run_zip(existing, target, total_files)
-            else:
-                self._run_mirror(existing, target, total_files)
+            # one walk, streamed: work starts right away and the progress total
+            # firms up from the estimate once the scan has seen every file
+            self.scan = SourceScan(existing, sep="/" if self.zip_mode else os.sep)
+            self.scan.start()
+            self.set_progress(0, self.expected_total)
+            try:
+                target = self._mk_backup_target()
+                if self.zip_mode and self.compression == "zstd":
+                    self._run_tar_zst(target)
+                elif self.zip_mode:
+                    self._run_zip(target)
+                else:
+                    self._run_mirror(target)
+            finally:
+                self.scan.stop()
+            self.total_files = self.scan.count
+            self.set_progress(self.total_files, max(self.total_files, 1), final=True)  # never throttled away
 
             self.log("Backup completed successfully. No errors reported." if not self.errors
                      else f"Completed with {len(self.errors)} error(s). See log for details.")
-            self.ui_queue.put(("done", target))
+            self._flush_log()
+            self._post("done", target)
 
         except KeyboardInterrupt:
             self.log("Backup cancelled by user.")
-            self.ui_queue.put(("cancelled", None))
+            self._flush_log()
+            self._post("cancelled", None)
         except Exception as e:
             tb = traceback.format_exc()
             self.log(f"Fatal error: {e}\n{tb}")
-            self.ui_queue.put(("failed", str(e)))
+            self._flush_log()
+            self._post("failed", str(e))
 
     # ZIP
-    def _run_zip(self, existing_sources, archive_path, total_files):
-        self.log(f"ZIP mode: {archive_path}")
-        log_lines = []; count = 0
-        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for src_root in existing_sources:
-                parent = os.path.basename(os.path.dirname(src_root)); leaf = os.path.basename(src_root)
-                tagged_base = f"{parent}__{leaf}" if parent else leaf
+    def _zip_reader(self, pool, out_q, halt, budget):
+        """
+        Producer side of the ZIP pipeline: enumerate sources, group files into
+        batches and submit each batch to the process pool for reading and
+        compression. (future, entries, units) reach the writer in enumeration
+        order; oversized or unreadable files travel with future=None. Files the
+        manifest shows unchanged ride along in a batch without being compressed.
+        Each batch first takes one budget unit per started ZIP_BATCH_BYTES of
+        source, which the writer gives back once the batch is written.
+        """
+        batch = []; batch_bytes = 0
+        prev_files = self._prev_files
+
+        def push(item):
+            while not halt.is_set():
+                try:
+                    out_q.put(item, timeout=0.1); return
+                except queue.Full:
+                    continue
+
+        def reserve(units):
+            got = 0
+            while got < units:
+                if halt.is_set(): return False
+                if budget.acquire(timeout=0.1): got += 1
+            return True
+
+        def flush():
+            nonlocal batch, batch_bytes
+            if batch:
+                # one oversized file still has to fit: never ask for more than the whole budget
+                units = min(-(-batch_bytes // ZIP_BATCH_BYTES), ZIP_IN_FLIGHT_BYTES // ZIP_BATCH_BYTES)
+                if not reserve(units): return
+                paths = [win_longpath(e[0]) for e in batch if e[5] is None]
+                push((pool.submit(compress_files, paths, self.zip_level) if paths else None, batch, units))
+                batch = []; batch_bytes = 0
+
+        try:
+            for i, src_root in enumerate(self.scan.roots):
+                tagged_base = _tagged_base(src_root)
                 self.log(f"Zipping: {src_root} -> /{tagged_base}/")
-                for src_file, rel_path in iter_files_under(src_root):
-                    if self.stop_flag: raise KeyboardInterrupt
-                    arcname = os.path.join(tagged_base, rel_path).replace("\\", "/")
+                arc_base = tagged_base + "/"
+                for src_file, rel_dir, name, entry in self.scan.files(i):
+                    if self.stop_event.is_set() or halt.is_set(): return
+                    arcname = arc_base + rel_dir + name
                     try:
-                        zf.write(win_longpath(src_file), arcname)
-                        log_lines.append(f"ZIP: {src_file} -> {arcname}")
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            st = os.stat(win_longpath(src_file))
+                        zi = make_zipinfo(arcname, st)
                     except Exception as e:
-                        err = f"[ERROR] ZIP {src_file} -> {arcname}: {e}"
+                        flush(); push((None, [(src_file, arcname, None, None, e, None)], 0)); continue
+                    # entry: (src_file, arcname, stat, zipinfo, error, manifest record if unchanged)
+                    prev = prev_files.get(src_file)
+                    if prev is not None and (prev[0] != st.st_size or prev[1] != st.st_mtime_ns): prev = None
+                    if prev is None and st.st_size > ZIP_BUFFER_MAX:
+                        flush(); push((None, [(src_file, arcname, st, zi, None, None)], 0)); continue
+                    size = st.st_size if prev is None else 0
+                    if batch_bytes + size > ZIP_BATCH_BYTES: flush()  # batches stay under ZIP_BATCH_BYTES...
+                    batch.append((src_file, arcname, st, zi, None, prev))
+                    batch_bytes += size  # ...unless a single file is bigger
+                    if batch_bytes >= ZIP_BATCH_BYTES or len(batch) >= ZIP_BATCH_FILES:
+                        flush()
+            flush()
+            push(None)
+        except BaseException as e:
+            push(e)
+
+    @staticmethod
+    def _reuse_entry(zf, prev_zf, zi, prev):
+        """Copy an unchanged file's compressed entry over from the previous archive; False if it isn't usable."""
+        pzi = prev_zf.NameToInfo.get(prev[3])
+        if pzi is None or pzi.CRC != prev[2] or pzi.file_size != prev[0]:
+            return False
+        try:
+            copy_raw_entry(prev_zf, pzi, zf, zi)  # CRC-checked, so a damaged old entry is recompressed instead
+        except (OSError, zipfile.BadZipFile):
+            return False
+        return True
+
+    def _open_prev_archive(self):
+        # incremental ZIP: the manifest maps source paths to (size, mtime_ns, crc, arcname)
+        # in the last archive; unchanged files are copied from it still compressed
+        self._prev_files = {}
+        m = self.manifest
+        if not (self.incremental and m.get("archive") and isinstance(m.get("files"), dict)):
+            return None
+        try:
+            prev_zf = zipfile.ZipFile(win_longpath(m["archive"]))
+        except (OSError, zipfile.BadZipFile):
+            self.log(f"Previous archive not available ({m['archive']}); compressing every file.")
+            return None
+        self._prev_files = m["files"]
+        self.log(f"Reusing unchanged entries from: {m['archive']}")
+        return prev_zf
+
+    def _run_zip(self, archive_path):
+        workers = min(os.cpu_count() or 1, ZIP_MAX_WORKERS)
+        self.log(f"ZIP mode: {archive_path} (level {self.zip_level}, {workers} compression processes)")
+        log_lines = []; count = 0; files = {}
+        prev_zf = self._open_prev_archive()
+        # spawn everywhere: matches Windows and avoids forking a threaded process
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        # up to 2 batches in flight per process: workers never idle waiting on the reader,
+        # while buffered payloads stay bounded, with a fixed ceiling on many-core machines
+        items = queue.Queue(maxsize=min(2 * workers, ZIP_MAX_IN_FLIGHT)); halt = threading.Event()
+        budget = threading.Semaphore(ZIP_IN_FLIGHT_BYTES // ZIP_BATCH_BYTES)
+        reader = threading.Thread(target=self._zip_reader, args=(pool, items, halt, budget), daemon=True)
+        reader.start()
+        try:
+            with open(archive_path, "wb", buffering=ZIP_WRITE_BUFFER) as raw, \
+                    zipfile.ZipFile(raw, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=self.zip_level) as zf:
+                while True:
+                    if self.stop_event.is_set(): raise KeyboardInterrupt
+                    try:
+                        item = items.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is None: break
+                    if isinstance(item, BaseException): raise item
+                    fut, entries, units = item
+                    results = iter(fut.result()) if fut is not None else None
+                    for src_file, arcname, st, zi, err, prev in entries:
+                        if self.stop_event.is_set(): raise KeyboardInterrupt
+                        try:
+                            if err is not None: raise err
+                            res = next(results) if prev is None and results is not None else None
+                            if prev is not None and self._reuse_entry(zf, prev_zf, zi, prev):
+                                log_lines.append(f"KEEP: {src_file} -> {arcname}")
+                            else:
+                                if prev is not None and st.st_size <= ZIP_BUFFER_MAX:
+                                    # manifest entry didn't match the old archive: compress it here
+                                    res = compress_files([win_longpath(src_file)], self.zip_level)[0]
+                                if res is None:
+                                    # too big to buffer: stream from disk on this thread, sniffing the head
+                                    # like the worker processes do so incompressible data is stored
+                                    src_path = win_longpath(src_file)
+                                    with open(src_path, "rb") as f: head = f.read(SNIFF_BYTES)
+                                    zf.write(src_path, arcname, compress_type=compress_type_for(arcname, head))
+                                else:
+                                    ctype, crc, size, payload, read_err = res
+                                    if read_err is not None: raise read_err
+                                    zi.compress_type = ctype
+                                    write_raw_entry(zf, zi, crc, size, payload)
+                                log_lines.append(f"ZIP: {src_file} -> {arcname}")
+                            files[src_file] = [st.st_size, st.st_mtime_ns, zf.filelist[-1].CRC, arcname]
+                        except Exception as e:
+                            err = f"[ERROR] ZIP {src_file} -> {arcname}: {e}"
+                            self.errors.append(err); log_lines.append(err); self.log(err)
+                        count += 1
+                        self._progress(count)
+                    fut = results = None  # drop the payloads before handing their budget back
+                    if units: budget.release(units)
+                zf.writestr("backup_log.txt", "\n".join(log_lines))
+            self.new_manifest = {"archive": archive_path, "files": files}
+        finally:
+            halt.set(); reader.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+            if prev_zf is not None: prev_zf.close()
+
+    # TAR.ZST
+    def _run_tar_zst(self, archive_path):
+        # zstd compresses on its own worker threads (threads=-1: one per core),
+        # so this thread only has to read files and feed the tar stream
+        self.log(f"Zstandard mode: {archive_path}")
+        log_lines = []; count = 0
+        cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+        with open(archive_path, "wb") as raw, cctx.stream_writer(raw) as zw, \
+                tarfile.open(fileobj=zw, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+            for i, src_root in enumerate(self.scan.roots):
+                tagged_base = _tagged_base(src_root)
+                self.log(f"Archiving: {src_root} -> /{tagged_base}/")
+                arc_base = tagged_base + "/"
+                for src_file, rel_dir, name, _ in self.scan.files(i):
+                    if self.stop_event.is_set(): raise KeyboardInterrupt
+                    arcname = arc_base + rel_dir + name
+                    try:
+                        with open(win_longpath(src_file), "rb") as f:
+                            tar.addfile(tar.gettarinfo(arcname=arcname, fileobj=f), f)
+                        log_lines.append(f"TAR: {src_file} -> {arcname}")
+                    except Exception as e:
+                        err = f"[ERROR] TAR {src_file} -> {arcname}: {e}"
                         self.errors.append(err); log_lines.append(err); self.log(err)
                     count += 1
-                    if count % 5 == 0 or count == total_files: self.set_progress(count, max(total_files, 1))
-            zf.writestr("backup_log.txt", "\n".join(log_lines))
+                    self._progress(count)
+            data = "\n".join(log_lines).encode("utf-8")
+            ti = tarfile.TarInfo("backup_log.txt"); ti.size = len(data); ti.mtime = time.time()
+            tar.addfile(ti, io.BytesIO(data))
 
     # MIRROR
-    def _run_mirror(self, existing_sources, backup_dir, total_files):
-        self.log(f"Mirror mode: {backup_dir}")
-        log_path = os.path.join(backup_dir, "backup_log.txt")
-        done = 0
-        with open(log_path, "w", encoding="utf-8") as lf:
+    @staticmethod
+    def _copy_one(src_file, dest_file):
+        try:
+            copy_file(win_longpath(src_file), win_longpath(dest_file))
+            return "COPY", src_file, dest_file, None
+        except Exception as e:
+            return "ERR", src_file, dest_file, e
+
+    def _run_mirror(self, backup_dir):
+        self.log(f"Mirror mode: {backup_dir} ({self.max_parallel_copies} parallel copies)")
+        self._mirror_sources(backup_dir, os.path.join(backup_dir, "backup_log.txt"))
+
+    def _mirror_sources(self, backup_dir, log_path):
+        done = 0; pending = set(); log_buf = []
+        # copies in flight are capped so a huge tree doesn't queue every file at once
+        window = max(COPY_WINDOW, 2 * self.max_parallel_copies)
+        with open(log_path, "w", encoding="utf-8", buffering=1024 * 1024) as lf, \
+                ThreadPoolExecutor(max_workers=STAT_WORKERS) as stat_pool, \
+                ThreadPoolExecutor(max_workers=self.max_parallel_copies) as copy_pool:
+
+            def note(line):
+                log_buf.append(line)
+                if len(log_buf) >= MIRROR_LOG_LINES:
+                    lf.write("".join(log_buf)); log_buf.clear()
+
+            def reap(limit):
+                # log finished copies until at most `limit` are still outstanding
+                nonlocal done
+                while len(pending) > limit:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        pending.discard(fut)
+                        status, src_file, dest_file, e = fut.result()
+                        if status == "COPY":
+                            note(f"COPY: {src_file} -> {dest_file}\n")
+                        else:
+                            err = f"[ERROR] {src_file} -> {dest_file}: {e}"
+                            self.errors.append(err); note(err + "\n"); self.log(err)
+                        done += 1
+                        self._progress(done)
+                    if self.stop_event.is_set(): raise KeyboardInterrupt
+
             lf.write(f"Elite Dangerous Backup Log (Mirror) - {datetime.now().isoformat()}\n")
             lf.write(f"Destination: {backup_dir}\n")
             lf.write(f"Incremental: {'ON' if self.incremental else 'OFF'}\n\n")
-            for src_root in existing_sources:
-                parent = os.path.basename(os.path.dirname(src_root)); leaf = os.path.basename(src_root)
-                tagged_base = f"{parent}__{leaf}" if parent else leaf
-                dest_base = os.path.join(backup_dir, tagged_base)
-                self.log(f"Copying: {src_root} -> {dest_base}")
-                os.makedirs(dest_base, exist_ok=True)
-
-                for src_file, rel_path in iter_files_under(src_root):
-                    if self.stop_flag: raise KeyboardInterrupt
-                    dest_file = os.path.join(dest_base, rel_path)
-                    dest_dir = os.path.dirname(dest_file)
-                    try:
-                        if self.incremental and os.path.exists(dest_file) and is_unchanged(src_file, dest_file):
-                            lf.write(f"SKIP: {src_file}\n")
+            try:
+                for i, src_root in enumerate(self.scan.roots):
+                    tagged_base = _tagged_base(src_root)
+                    dest_base = os.path.join(backup_dir, tagged_base)
+                    self.log(f"Copying: {src_root} -> {dest_base}")
+                    os.makedirs(dest_base, exist_ok=True)
+                    # rel_dir -> destination directory (with trailing sep), created on first sight
+                    dest_dirs = {"": dest_base + os.sep}
+
+                    files = self.scan.files(i)
+                    while True:
+                        chunk = list(islice(files, STAT_CHUNK))
+                        if not chunk: break
+                        # one mkdir per new directory (parents first) instead of one makedirs per file;
+                        # a failure here surfaces as a per-file copy error below
+                        new_dirs = sorted({c[1] for c in chunk if c[1] not in dest_dirs}, key=len)
+                        for rel_dir in new_dirs:
+                            dest_dirs[rel_dir] = d = dest_base + os.sep + rel_dir
+                            try:
+                                # parents come first, so usually a single mkdir does it; makedirs
+                                # only when a parent was never seen (it holds no files of its own)
+                                os.mkdir(d)
+                            except FileExistsError:
+                                pass
+                            except FileNotFoundError:
+                                try:
+                                    os.makedirs(d, exist_ok=True)
+                                except OSError:
+                                    pass
+                            except OSError:
+                                pass
+                        dests = [dest_dirs[rel_dir] + name for _, rel_dir, name, _ in chunk]
+                        if self.incremental:
+                            unchanged = stat_pool.map(
+                                lambda c, d: is_unchanged(c[0], d, src_stat=c[3]), chunk, dests)
                         else:
-                            os.makedirs(dest_dir, exist_ok=True)
-                            shutil.copy2(win_longpath(src_file), win_longpath(dest_file))
-                            lf.write(f"COPY: {src_file} -> {dest_file}\n")
-                    except Exception as e:
-                        err = f"[ERROR] {src_file} -> {dest_file}: {e}"
-                        self.errors.append(err); lf.write(err + "\n"); self.log(err)
-                    done += 1
-                    if done % 5 == 0 or done == total_files: self.set_progress(done, max(total_files, 1))
+                            unchanged = repeat(False)
+                        # unchanged files are logged right away; the rest go to the copy pool
+                        for (src_file, _, _, _), dest_file, skip in zip(chunk, dests, unchanged):
+                            if self.stop_event.is_set(): raise KeyboardInterrupt
+                            if skip:
+                                note(f"SKIP: {src_file}\n")
+                                done += 1
+                                self._progress(done)
+                            else:
+                                reap(window - 1)
+                                pending.add(copy_pool.submit(self._copy_one, src_file, dest_file))
+                reap(0)
+            except KeyboardInterrupt:
+                for fut in pending: fut.cancel()
+                raise
+            finally:
+                lf.write("".join(log_buf))
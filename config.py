@@ -1,6 +1,20 @@
+import functools
 import json
 import os
-from constants import CONFIG_DIR, CONFIG_PATH, HELP_PATH, HELP_DEFAULT
+from constants import CONFIG_DIR, CONFIG_PATH, HELP_PATH, HELP_DEFAULT_BYTES, MANIFEST_PATH
+
+try:
+    import orjson  # optional: faster config (de)serialization
+except ImportError:
+    orjson = None
+
+# compact output: config is rewritten on every toggle and the ZIP manifest can be large
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj): return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    _loads = json.loads
 
 def ensure_config_dir():
     os.makedirs(CONFIG_DIR, exist_ok=True)
@@ -8,36 +22,57 @@ def ensure_config_dir():
 def ensure_help_file():
     ensure_config_dir()
     if not os.path.exists(HELP_PATH) or os.path.getsize(HELP_PATH) == 0:
-        with open(HELP_PATH, "w", encoding="utf-8") as f:
-            f.write(HELP_DEFAULT)
+        fd = os.open(HELP_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.write(fd, HELP_DEFAULT_BYTES)
+        finally:
+            os.close(fd)
 
-def default_sources():
-    userprofile = os.environ.get("USERPROFILE", os.path.expanduser("~"))
-    localapp = os.environ.get("LOCALAPPDATA", os.path.join(userprofile, "AppData", "Local"))
-    saved_games = os.path.join(userprofile, "Saved Games")
-    return [
+# Per-user locations don't change while the app runs; resolve them once
+USERPROFILE = os.environ.get("USERPROFILE", os.path.expanduser("~"))
+LOCALAPPDATA = os.environ.get("LOCALAPPDATA", os.path.join(USERPROFILE, "AppData", "Local"))
+
+@functools.lru_cache(maxsize=1)
+def _default_sources():
+    saved_games = os.path.join(USERPROFILE, "Saved Games")
+    return (
         os.path.join(saved_games, "Frontier Developments", "Elite Dangerous"),
-        os.path.join(localapp, "Frontier Developments"),
-        os.path.join(localapp, "Frontier_Developments"),
-    ]
+        os.path.join(LOCALAPPDATA, "Frontier Developments"),
+        os.path.join(LOCALAPPDATA, "Frontier_Developments"),
+    )
 
-def load_config():
+def default_sources():
+    return list(_default_sources())  # fresh list: callers store it in cfg
+
+def _load_json(path):
     try:
-        if os.path.isfile(CONFIG_PATH):
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-                if isinstance(cfg, dict):
-                    return cfg
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                obj = _loads(f.read())
+                if isinstance(obj, dict):
+                    return obj
     except Exception:
         pass
     return {}
 
-def save_config(cfg: dict):
+def _save_json(path, obj):
     ensure_config_dir()
-    tmp = CONFIG_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    os.replace(tmp, CONFIG_PATH)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_dumps(obj))
+    os.replace(tmp, path)
+
+def load_config():
+    return _load_json(CONFIG_PATH)
+
+def save_config(cfg: dict):
+    _save_json(CONFIG_PATH, cfg)
+
+def load_manifest():
+    return _load_json(MANIFEST_PATH)
+
+def save_manifest(manifest: dict):
+    _save_json(MANIFEST_PATH, manifest)
 
 def get_config_with_defaults():
     cfg = load_config()
@@ -45,6 +80,10 @@ def get_config_with_defaults():
         cfg["sources"] = default_sources()
     cfg.setdefault("zip_mode", False)
     cfg.setdefault("incremental", True)
+    cfg.setdefault("compression", "deflate")  # deflate (.zip) | zstd (.tar.zst)
+    cfg.setdefault("zip_level", 3)  # DEFLATE level for .zip: 3 keeps most of 6's ratio at about twice the speed
+    cfg.setdefault("max_parallel_copies", 4)  # mirror mode: concurrent file copies
+    cfg.setdefault("last_backup_count", 0)  # progress estimate for the next run
     cfg.setdefault("theme", "elite")  # elite | dark | light
     return cfg
 
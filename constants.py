@@ -6,6 +6,7 @@ VERSION = "1.6.0"  # modular refactor
 CONFIG_DIR = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), APP_NAME)
 CONFIG_PATH = os.path.join(CONFIG_DIR, "config.json")
 HELP_PATH = os.path.join(CONFIG_DIR, "help.md")
+MANIFEST_PATH = os.path.join(CONFIG_DIR, "manifest.json")  # incremental ZIP: what went into the last archive
 
 HELP_DEFAULT = """# Elite Dangerous Backup — User Guide
 
@@ -17,6 +18,9 @@ HELP_DEFAULT = """# Elite Dangerous Backup — User Guide
 - **Pick Sources:** Choose up to three folders (Browse… or paste).
 - **Choose Mode:**
   - **ZIP Archive** → one `.zip` with everything.
+    - **Incremental** → unchanged files are copied over from your last ZIP instead of being compressed again.
+    - **Compression level** → 1 is fastest, 9 gives the smallest file; the default 3 is a good balance.
+    - **Zstandard** → one `.tar.zst` instead; much faster on multi-core PCs (needs the `zstandard` module).
   - **Mirror** → normal folders.
     - **Incremental** → skips files that haven’t changed (size + modified time).
 - **Select Destination:** Choose your USB drive from the list or **Browse…** to any folder.
@@ -35,7 +39,8 @@ HELP_DEFAULT = """# Elite Dangerous Backup — User Guide
 
 ## What Gets Created
 - **ZIP mode:**  
-  `EliteDangerousBackup_<COMPUTERNAME>_<YYYYmmdd_HHMMSS>.zip`
+  `EliteDangerousBackup_<COMPUTERNAME>_<YYYYmmdd_HHMMSS>.zip`  
+  (or `.tar.zst` with Zstandard enabled)
 - **Mirror mode:**  
   `EliteDangerousBackup_<COMPUTERNAME>_<YYYYmmdd_HHMMSS>\\`  
   with `backup_log.txt`.
@@ -49,9 +54,11 @@ Matches by **size** and **modified time** (±1s).
 
 ## Where Config & Guide Live
 - **Config:** `%LOCALAPPDATA%\\EliteBackup\\config.json`
+- **Last ZIP manifest:** `%LOCALAPPDATA%\\EliteBackup\\manifest.json`
 - **Guide:**  `%LOCALAPPDATA%\\EliteBackup\\help.md`
 
 ---
 
 Fly safe, CMDR. o7
 """
+HELP_DEFAULT_BYTES = HELP_DEFAULT.encode("utf-8")
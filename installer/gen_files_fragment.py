@@ -3,34 +3,44 @@ import os, uuid, pathlib
 SRC = pathlib.Path(r"..\dist\EliteDangerousBackup").resolve()
 OUT = pathlib.Path("FilesFragment.wxs").resolve()
 
-def wix_guid():
-    return "{" + str(uuid.uuid4()).upper() + "}"
+HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+          '<Wix xmlns="http://wixtoolset.org/schemas/v4/wxs">\n'
+          '  <Fragment>\n'
+          '    <ComponentGroup Id="EDB_OtherFiles">\n')
+FILE_TMPL = ('      <Component Id="{comp_id}" Directory="INSTALLDIR" Guid="{guid}">\n'
+             '        <File Id="{file_id}" Source="$(var.SourceDir)\\{rel}" />\n'
+             '      </Component>\n')
+FOOTER = ('    </ComponentGroup>\n'
+          '  </Fragment>\n'
+          '</Wix>\n')
+
+def wix_guids(n):
+    # One urandom read for all components; UUID(version=4) sets the version/variant bits
+    raw = os.urandom(16 * n)
+    return ["{" + str(uuid.UUID(bytes=raw[i:i + 16], version=4)).upper() + "}" for i in range(0, 16 * n, 16)]
+
+def iter_rel_files(root):
+    stack = [(str(root), "")]
+    while stack:
+        dir_path, rel_base = stack.pop()
+        with os.scandir(dir_path) as it:
+            for e in it:
+                if e.is_dir():
+                    stack.append((e.path, rel_base + e.name + os.sep))
+                else:
+                    yield rel_base + e.name
 
 def main():
-    items = []
-    for root, _, files in os.walk(SRC):
-        for f in files:
-            p = pathlib.Path(root, f)
-            # Skip main exe; Product.wxs already declares it as KeyPath
-            if p.name.lower() == "elitedangerousbackup.exe":
-                continue
-            rel = p.relative_to(SRC)
-            comp_id = "EDB_" + "_".join(rel.parts).replace(".", "_").replace("-", "_")
-            file_id = comp_id + "_file"
-            items.append((comp_id, file_id, str(p)))
+    # Skip main exe; Product.wxs already declares it as KeyPath
+    rels = sorted(r for r in iter_rel_files(SRC) if os.path.basename(r).lower() != "elitedangerousbackup.exe")
+    guids = wix_guids(len(rels))
+    lines = []
+    for rel, guid in zip(rels, guids):
+        comp_id = "EDB_" + rel.replace(os.sep, "_").replace(".", "_").replace("-", "_")
+        lines.append(FILE_TMPL.format(comp_id=comp_id, guid=guid, file_id=comp_id + "_file", rel=rel))
 
     with open(OUT, "w", encoding="utf-8") as w:
-        w.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        w.write('<Wix xmlns="http://wixtoolset.org/schemas/v4/wxs">\n')
-        w.write('  <Fragment>\n')
-        w.write('    <ComponentGroup Id="EDB_OtherFiles">\n')
-        for comp_id, file_id, fullpath in items:
-            w.write(f'      <Component Id="{comp_id}" Directory="INSTALLDIR" Guid="{wix_guid()}">\n')
-            w.write(f'        <File Id="{file_id}" Source="$(var.SourceDir)\\{os.path.relpath(fullpath, SRC)}" />\n')
-            w.write('      </Component>\n')
-        w.write('    </ComponentGroup>\n')
-        w.write('  </Fragment>\n')
-        w.write('</Wix>\n')
+        w.write(HEADER + "".join(lines) + FOOTER)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import multiprocessing
+
 from ui.app import App
 from windows import enable_high_dpi
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # ZIP compression runs in worker processes (PyInstaller build)
     enable_high_dpi()
     app = App()
     app.mainloop()
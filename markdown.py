@@ -2,15 +2,60 @@ import re
 import tkinter as tk
 import tkinter.font as tkfont
 
-def render_markdown(text_widget: tk.Text, md: str):
-    text_widget.config(state="normal")
-    text_widget.delete("1.0", "end")
+_INLINE_CODE_RE = re.compile(r"`([^`]+)`")
+
+# tag tuples handed to Text.insert, built once
+_H1 = ("h1",); _H2 = ("h2",); _HR = ("hr",); _CODEBLOCK = ("codeblock",)
+_P = ("p",); _P_CODE = ("p", "code")
+_LI = ("li",); _LI_CODE = ("li", "code")
+_HR_LINE = "────────────────────────────────\n"
+
+def _inline(out, content, tags, code_tags):
+    # content as (text, tags) pairs for Text.insert, `code` spans tagged "code"
+    last = 0
+    for m in _INLINE_CODE_RE.finditer(content):
+        if m.start() > last: out += (content[last:m.start()], tags)
+        out += (m.group(1), code_tags)
+        last = m.end()
+    out += (content[last:] + "\n", tags)
+
+def _heading(out, line, stripped):
+    if line.startswith("# "): out += (line[2:].strip() + "\n", _H1)
+    elif line.startswith("## "): out += (line[3:].strip() + "\n", _H2)
+    else: return False
+    return True
+
+def _rule_or_item(out, line, stripped):
+    if line.strip() == "---": out += (_HR_LINE, _HR)
+    elif stripped.startswith(("- ", "* ")): _inline(out, "• " + stripped[2:], _LI, _LI_CODE)
+    else: return False
+    return True
 
-    base = tkfont.nametofont("TkDefaultFont")
-    h1 = tkfont.Font(family=base.cget("family"), size=base.cget("size")+6, weight="bold")
-    h2 = tkfont.Font(family=base.cget("family"), size=base.cget("size")+3, weight="bold")
-    codef = tkfont.Font(family="Consolas", size=base.cget("size"))
+def _quote(out, line, stripped):
+    if not stripped.startswith("> "): return False
+    out += (stripped + "\n", _P)
+    return True
 
+# block handlers keyed by the first non-blank character; False -> plain paragraph
+_BLOCKS = {"#": _heading, "-": _rule_or_item, "*": _rule_or_item, ">": _quote}
+
+_FONTS = None  # (h1, h2, code): created on first render, shared by every help window
+
+def _fonts():
+    global _FONTS
+    if _FONTS is None:
+        base = tkfont.nametofont("TkDefaultFont")
+        family, size = base.cget("family"), base.cget("size")
+        _FONTS = (tkfont.Font(family=family, size=size+6, weight="bold"),
+                  tkfont.Font(family=family, size=size+3, weight="bold"),
+                  tkfont.Font(family="Consolas", size=size))
+    return _FONTS
+
+def _setup_tags(text_widget: tk.Text):
+    # once per widget: re-rendering into the same Text reuses its tag config
+    if getattr(text_widget, "_md_configured", False):
+        return
+    h1, h2, codef = _fonts()
     text_widget.tag_configure("h1", font=h1, spacing1=8, spacing3=6)
     text_widget.tag_configure("h2", font=h2, spacing1=6, spacing3=4)
     text_widget.tag_configure("p", spacing1=2, spacing3=6)
@@ -19,73 +64,40 @@ def render_markdown(text_widget: tk.Text, md: str):
     text_widget.tag_configure("codeblock", font=codef, background="#f5f5f5",
                               lmargin1=12, lmargin2=12, spacing1=4, spacing3=6)
     text_widget.tag_configure("hr", spacing1=8, spacing3=8)
+    text_widget._md_configured = True
 
-    lines = md.splitlines()
-    i = 0
+def parse_markdown(md: str):
+    """Flat (text, tags, text, tags, ...) sequence for Text.insert; reusable across renders."""
+    out = []
     in_code = False
     code_buf = []
-    inline_code_re = re.compile(r"`([^`]+)`")
-
-    def flush_codeblock():
-        if code_buf:
-            text_widget.insert("end", "\n".join(code_buf) + "\n", ("codeblock",))
-            code_buf.clear()
-
-    while i < len(lines):
-        line = lines[i]
 
-        if line.strip().startswith("```"):
-            if in_code:
+    for line in md.splitlines():
+        # most lines start flush left: only strip when there is leading blank space
+        stripped = line.lstrip() if line[:1] in " \t" else line
+        if in_code:
+            if stripped.startswith("```"):
+                if code_buf:
+                    out += ("\n".join(code_buf) + "\n", _CODEBLOCK); code_buf.clear()
                 in_code = False
-                flush_codeblock()
             else:
-                in_code = True
-            i += 1
+                code_buf.append(line)
             continue
+        if not stripped:
+            out += ("\n", _P); continue
+        ch = stripped[0]
+        if ch == "`" and stripped.startswith("```"):
+            in_code = True; continue
+        handler = _BLOCKS.get(ch)
+        if handler is None or not handler(out, line, stripped):
+            _inline(out, line, _P, _P_CODE)
+    return out
 
-        if in_code:
-            code_buf.append(line); i += 1; continue
-
-        if line.strip() == "---":
-            text_widget.insert("end", "────────────────────────────────\n", ("hr",))
-            i += 1; continue
-
-        if line.startswith("# "):
-            text_widget.insert("end", line[2:].strip() + "\n", ("h1",)); i += 1; continue
-        if line.startswith("## "):
-            text_widget.insert("end", line[3:].strip() + "\n", ("h2",)); i += 1; continue
-
-        stripped = line.lstrip()
-        if stripped.startswith("- ") or stripped.startswith("* "):
-            content = stripped[2:]
-            pos = 0
-            while True:
-                m = inline_code_re.search(content, pos)
-                if not m:
-                    text_widget.insert("end", "• " + content[pos:] + "\n", ("li",)); break
-                if m.start() > pos:
-                    text_widget.insert("end", "• " + content[pos:m.start()], ("li",))
-                text_widget.insert("end", m.group(1), ("li", "code"))
-                pos = m.end()
-                if pos >= len(content):
-                    text_widget.insert("end", "\n", ("li",)); break
-            i += 1; continue
-
-        if stripped.startswith("> "):
-            text_widget.insert("end", stripped + "\n", ("p",)); i += 1; continue
-
-        if not line.strip():
-            text_widget.insert("end", "\n", ("p",)); i += 1; continue
-
-        content = line; last = 0
-        while True:
-            m = inline_code_re.search(content, last)
-            if not m:
-                text_widget.insert("end", content[last:] + "\n", ("p",)); break
-            if m.start() > last:
-                text_widget.insert("end", content[last:m.start()], ("p",))
-            text_widget.insert("end", m.group(1), ("p", "code"))
-            last = m.end()
-        i += 1
-
+def render_markdown(text_widget: tk.Text, md):
+    """Render markdown text, or a sequence already returned by parse_markdown."""
+    out = parse_markdown(md) if isinstance(md, str) else md
+    text_widget.config(state="normal")
+    text_widget.delete("1.0", "end")
+    _setup_tags(text_widget)
+    if out: text_widget.insert("end", *out)
     text_widget.config(state="disabled")
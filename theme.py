@@ -1,4 +1,5 @@
 import tkinter as tk
+import weakref
 from tkinter import ttk
 
 THEMES = {
@@ -99,24 +100,19 @@ def apply_theme(root: tk.Tk, style: ttk.Style, theme_key: str):
     root._theme_helpers = {"style_text": style_text_widget, "style_entry": style_entry_widget}
     restyle_everything(root)
 
-def _iter_widgets(widget):
-    yield widget
-    for child in widget.winfo_children():
-        yield from _iter_widgets(child)
+def register_themed(root: tk.Misc, widget: tk.Widget, kind: str):
+    # tk (non-ttk) widgets need explicit colors: track them ("text" | "entry") and style now;
+    # weakly held, so a closed help window's Text drops out on its own
+    themed = getattr(root, "_themed_widgets", None)
+    if themed is None:
+        themed = root._themed_widgets = weakref.WeakKeyDictionary()
+    themed[widget] = kind
+    style = getattr(root, "_theme_helpers", {}).get("style_" + kind)
+    if style: style(widget)
+    return widget
 
 def restyle_everything(root: tk.Misc):
     helpers = getattr(root, "_theme_helpers", {})
-    style_text = helpers.get("style_text")
-    style_entry = helpers.get("style_entry")
-    for w in _iter_widgets(root):
-        try:
-            klass = w.winfo_class()
-        except Exception:
-            continue
-        if klass == "Text" and style_text:
-            style_text(w)
-        elif klass == "Entry" and style_entry:
-            style_entry(w)
-
-def apply_theme_to_toplevel(win: tk.Toplevel):
-    restyle_everything(win)
+    for w, kind in list(getattr(root, "_themed_widgets", {}).items()):
+        style = helpers.get("style_" + kind)
+        if style and w.winfo_exists(): style(w)
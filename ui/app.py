@@ -1,18 +1,24 @@
-import queue
+import json
 import os
+import threading
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
 from constants import VERSION, HELP_PATH
 from config import (
     ensure_config_dir, ensure_help_file, get_config_with_defaults,
-    save_config, read_help_text, default_sources
+    save_config, read_help_text, default_sources, load_manifest, save_manifest
 )
-from theme import apply_theme, apply_theme_to_toplevel, THEME_ORDER, restyle_everything
-from windows import list_removable_drives, win_longpath
-from markdown import render_markdown
+from theme import apply_theme, register_themed, THEME_ORDER
+from windows import list_removable_drives, list_removable_drives_cached, watch_device_changes, win_longpath
+from markdown import parse_markdown, render_markdown
 from backup import BackupWorker
 
+POLL_SAFETY_MS = 500  # queue messages come with a <<BackupMsg>> event; the timer only catches strays
+CFG_SAVE_DELAY_MS = 500  # config writes are debounced: rapid toggles collapse into one save
+LOG_MAX_LINES = 5000  # log view keeps the newest lines; the full log is in backup_log.txt
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -23,18 +29,29 @@ class App(tk.Tk):
         ensure_config_dir()
         ensure_help_file()
 
-        self.ui_queue = queue.Queue()
+        # worker -> UI messages; deque append/popleft are atomic, no lock per message
+        self.ui_queue = deque()
         self.worker = None
+        self._last_pct = -1  # last value applied to the progress bar
+        self._help_cache = None  # (help.md mtime_ns, parsed markdown)
 
-        cfg = get_config_with_defaults()
+        # read once; handlers update this dict from the Tk vars and save it
+        self._cfg = cfg = get_config_with_defaults()
+        self._cfg_saved = json.dumps(cfg, sort_keys=True)  # what's on disk; unchanged config isn't rewritten
+        self._cfg_flush_id = None
         self.source_vars = [tk.StringVar(value=cfg["sources"][0]),
                             tk.StringVar(value=cfg["sources"][1]),
                             tk.StringVar(value=cfg["sources"][2])]
         self.zip_var = tk.BooleanVar(value=cfg.get("zip_mode", False))
         self.incr_var = tk.BooleanVar(value=cfg.get("incremental", True))
+        self.zstd_var = tk.BooleanVar(value=cfg.get("compression") == "zstd")
+        self.zip_level_var = tk.StringVar(value=str(cfg.get("zip_level", 3)))
         self.theme_var = tk.StringVar(value=cfg.get("theme", "elite"))
         self.dest_dir_var = tk.StringVar()
         self.drive_var = tk.StringVar()
+        # any edit to a saved setting syncs self._cfg and (re)arms the debounced save
+        for var in (*self.source_vars, self.zip_var, self.incr_var, self.zstd_var, self.zip_level_var, self.theme_var):
+            var.trace_add("write", self._on_setting_changed)
 
         self.style = ttk.Style()
         apply_theme(self, self.style, self.theme_var.get())
@@ -42,7 +59,10 @@ class App(tk.Tk):
         self._build_menu()
         self._create_widgets()
         self._apply_mode_rules()
-        self.after(100, self._poll_queue)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._watch_device_changes()
+        self.bind("<<BackupMsg>>", lambda _e: self._drain_queue())
+        self.after(POLL_SAFETY_MS, self._poll_queue)
 
     # Menubar
     def _build_menu(self):
@@ -77,17 +97,24 @@ class App(tk.Tk):
 
         mode_frame = ttk.LabelFrame(frm, text="Backup Options")
         mode_frame.grid(row=7, column=0, columnspan=5, sticky="ew", padx=10, pady=(0,10))
-        self.chk_zip = ttk.Checkbutton(mode_frame, text="Create ZIP archive (single .zip file)", variable=self.zip_var, command=self._on_zip_toggle)
+        self.chk_zip = ttk.Checkbutton(mode_frame, text="Create ZIP archive (single .zip file)", variable=self.zip_var, command=self._apply_mode_rules)
         self.chk_zip.grid(row=0, column=0, sticky="w", padx=10, pady=6)
-        self.chk_incr = ttk.Checkbutton(mode_frame, text="Incremental copy (skip unchanged files)", variable=self.incr_var, command=self._on_incr_toggle)
+        self.chk_incr = ttk.Checkbutton(mode_frame, text="Incremental copy (skip unchanged files)", variable=self.incr_var)
         self.chk_incr.grid(row=1, column=0, sticky="w", padx=10, pady=6)
+        self.chk_zstd = ttk.Checkbutton(mode_frame, text="Use Zstandard (.tar.zst, faster multi-core compression)", variable=self.zstd_var, command=self._apply_mode_rules)
+        self.chk_zstd.grid(row=2, column=0, sticky="w", padx=10, pady=6)
+        level_row = ttk.Frame(mode_frame); level_row.grid(row=3, column=0, sticky="w", padx=10, pady=6)
+        ttk.Label(level_row, text="ZIP compression level (1 = fastest, 9 = smallest):").pack(side="left")
+        self.zip_level_combo = ttk.Combobox(level_row, textvariable=self.zip_level_var, values=("1", "3", "6", "9"),
+                                            state="readonly", width=4)
+        self.zip_level_combo.pack(side="left", padx=(6, 0))
 
         ttk.Separator(frm, orient="horizontal").grid(row=8, column=0, columnspan=5, sticky="ew", **padding)
 
         ttk.Label(frm, text="Destination (USB) drive:").grid(row=9, column=0, sticky="w", **padding)
         self.drive_combo = ttk.Combobox(frm, textvariable=self.drive_var, state="readonly", width=18)
         self.drive_combo.grid(row=9, column=1, sticky="w")
-        ttk.Button(frm, text="Refresh Drives", command=self._refresh_drives).grid(row=9, column=2, sticky="w", padx=6)
+        ttk.Button(frm, text="Refresh Drives", command=lambda: self._refresh_drives(fresh=True)).grid(row=9, column=2, sticky="w", padx=6)
         ttk.Button(frm, text="Browse…", command=self._browse_dest).grid(row=9, column=3, sticky="e", padx=10)
 
         self._refresh_drives()
@@ -98,7 +125,7 @@ class App(tk.Tk):
         self.progress.grid(row=11, column=0, columnspan=5, sticky="ew", padx=10)
 
         ttk.Label(frm, text="Log:").grid(row=12, column=0, sticky="w", **padding)
-        self.log_text = tk.Text(frm, height=16, wrap="word")
+        self.log_text = self._make_text(frm, height=16, wrap="word")
         self.log_text.grid(row=13, column=0, columnspan=5, sticky="nsew", padx=10, pady=(0,10))
 
         btn_frame = ttk.Frame(frm); btn_frame.grid(row=14, column=0, columnspan=5, sticky="e", padx=10, pady=(0,10))
@@ -110,7 +137,9 @@ class App(tk.Tk):
         frm.grid_rowconfigure(13, weight=1)
         frm.grid_columnconfigure(2, weight=1); frm.grid_columnconfigure(3, weight=1); frm.grid_columnconfigure(4, weight=1)
 
-        restyle_everything(self)
+    def _make_text(self, parent, **kw):
+        # tk.Text isn't covered by ttk styles; registered widgets are restyled on theme change
+        return register_themed(self, tk.Text(parent, **kw), "text")
 
     def _add_source_row(self, parent, row, label, var):
         ttk.Label(parent, text=label).grid(row=row, column=0, sticky="w", padx=10, pady=4)
@@ -120,57 +149,88 @@ class App(tk.Tk):
 
     # Theme
     def _cycle_theme(self):
-        from theme import THEME_ORDER, apply_theme, restyle_everything
+        from theme import THEME_ORDER, apply_theme
         current = self.theme_var.get()
         idx = THEME_ORDER.index(current) if current in THEME_ORDER else 0
         new_theme = THEME_ORDER[(idx + 1) % len(THEME_ORDER)]
         self.theme_var.set(new_theme)
-        cfg = get_config_with_defaults()
-        cfg["theme"] = new_theme
-        cfg["sources"] = [v.get().strip() for v in self.source_vars]
-        cfg["zip_mode"] = bool(self.zip_var.get())
-        cfg["incremental"] = bool(self.incr_var.get())
-        save_config(cfg)
-        apply_theme(self, self.style, new_theme)
-        restyle_everything(self)
+        apply_theme(self, self.style, new_theme)  # also restyles the registered tk widgets
         self._log(f"Theme set to: {new_theme.capitalize()}")
 
     # Mode
     def _apply_mode_rules(self):
         if self.zip_var.get():
-            self.chk_incr.state(["disabled"])
+            self.chk_zstd.state(["!disabled"])
+            # incremental ZIP reuses entries from the last .zip; .tar.zst always writes everything
+            self.chk_incr.state(["disabled" if self.zstd_var.get() else "!disabled"])
+            self.zip_level_combo.state(["disabled" if self.zstd_var.get() else "!disabled"])
         else:
-            self.chk_incr.state(["!disabled"])
-
-    def _on_zip_toggle(self):
-        self._apply_mode_rules(); self._save_paths()
-
-    def _on_incr_toggle(self):
-        self._save_paths()
+            self.chk_incr.state(["!disabled"]); self.chk_zstd.state(["disabled"])
+            self.zip_level_combo.state(["disabled"])
 
     # Sources
     def _browse_source(self, var):
         d = filedialog.askdirectory(title="Choose source folder")
         if d:
-            var.set(d); self._save_paths()
+            var.set(d)
 
-    def _save_paths(self):
-        cfg = get_config_with_defaults()
+    def _sync_cfg(self):
+        cfg = self._cfg
         cfg["sources"] = [v.get().strip() for v in self.source_vars]
         cfg["zip_mode"] = bool(self.zip_var.get())
         cfg["incremental"] = bool(self.incr_var.get())
+        cfg["compression"] = "zstd" if self.zstd_var.get() else "deflate"
+        cfg["zip_level"] = int(self.zip_level_var.get())
         cfg["theme"] = self.theme_var.get()
-        save_config(cfg); self._log("Configuration saved.")
+        return cfg
+
+    def _on_setting_changed(self, *_):
+        self._sync_cfg(); self._save_cfg()
+
+    def _save_cfg(self):
+        # every change restarts the timer, so a burst of edits saves once, after it settles
+        if self._cfg_flush_id is not None: self.after_cancel(self._cfg_flush_id)
+        self._cfg_flush_id = self.after(CFG_SAVE_DELAY_MS, self._flush_cfg)
+
+    def _flush_cfg(self):
+        if self._cfg_flush_id is not None:
+            self.after_cancel(self._cfg_flush_id); self._cfg_flush_id = None
+        snapshot = json.dumps(self._cfg, sort_keys=True)
+        if snapshot != self._cfg_saved:
+            save_config(self._cfg); self._cfg_saved = snapshot
+
+    def _on_close(self):
+        self._flush_cfg()  # don't lose a write still waiting on the debounce
+        self.destroy()
+
+    def _save_paths(self):
+        self._sync_cfg(); self._save_cfg(); self._log("Configuration saved.")
 
     def _reset_defaults(self):
         defs = default_sources()
         for i in range(3):
             self.source_vars[i].set(defs[i] if i < len(defs) else "")
-        self._save_paths(); self._log("Reset to detected defaults and saved.")
+        self._log("Reset to detected defaults.")
 
     # Destination
-    def _refresh_drives(self):
-        drives = list_removable_drives()
+    def _watch_device_changes(self):
+        # USB plug/unplug refreshes the drive list (Windows); otherwise it's refreshed on demand only
+        self.bind("<<DeviceChange>>", lambda _e: self._refresh_drives())
+        watch_device_changes(self._notify_device_change)
+
+    def _notify_device_change(self):
+        # called on the watcher thread
+        try:
+            self.event_generate("<<DeviceChange>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass
+
+    def _refresh_drives(self, fresh=False):
+        # drive enumeration can block on a hung drive: run it off the UI thread, result comes via ui_queue
+        scan = list_removable_drives if fresh else list_removable_drives_cached
+        threading.Thread(target=lambda: self._post("drives", scan()), daemon=True).start()
+
+    def _show_drives(self, drives):
         if not drives:
             self.drive_combo["values"] = []; self.drive_var.set("")
         else:
@@ -205,22 +265,49 @@ class App(tk.Tk):
             messagebox.showerror("No sources", "Please provide at least one source folder."); return
 
         self.log_text.delete("1.0", "end")
-        self.progress["value"] = 0; self.progress["maximum"] = 100
+        self._show_progress(0, 100); self.progress["maximum"] = 100
         self.btn_start.configure(state="disabled"); self.btn_cancel.configure(state="normal")
 
         zip_mode = bool(self.zip_var.get()); incremental = bool(self.incr_var.get())
-        self.worker = BackupWorker(sources, dest_root, self.ui_queue, zip_mode=zip_mode, incremental=incremental)
+        compression = "zstd" if self.zstd_var.get() else "deflate"
+        cfg = self._cfg
+        self.worker = BackupWorker(sources, dest_root, self.ui_queue, zip_mode=zip_mode, incremental=incremental,
+                                   compression=compression, zip_level=cfg["zip_level"],
+                                   max_parallel_copies=cfg["max_parallel_copies"],
+                                   expected_total=cfg["last_backup_count"],
+                                   manifest=load_manifest() if zip_mode and incremental else None,
+                                   notify=self._notify)
         self.worker.start()
-        mode_str = "ZIP archive" if zip_mode else ("Incremental mirror" if incremental else "Full mirror")
+        if zip_mode:
+            mode_str = "Zstandard archive" if compression == "zstd" else \
+                ("Incremental ZIP archive" if incremental else "ZIP archive")
+        else:
+            mode_str = "Incremental mirror" if incremental else "Full mirror"
         self._log(f"Starting backup to: {dest_root}  |  Mode: {mode_str}")
 
+    def _remember_last_run(self):
+        # next run uses this as its progress total until its own scan finishes
+        self._cfg["last_backup_count"] = self.worker.total_files
+        self._save_cfg()
+        if self.worker.new_manifest is not None:
+            save_manifest(self.worker.new_manifest)
+
     def _cancel_backup(self):
         if self.worker and self.worker.is_alive():
-            self.worker.stop_flag = True; self._log("Cancel requested; stopping soon…")
+            self.worker.stop_event.set(); self._log("Cancel requested; stopping soon…")
 
     # Help/About
+    def _help_markdown(self):
+        # help.md is only re-read and re-parsed when it changed on disk
+        try:
+            mtime = os.stat(HELP_PATH).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or self._help_cache is None or self._help_cache[0] != mtime:
+            self._help_cache = (mtime, parse_markdown(read_help_text()))
+        return self._help_cache[1]
+
     def _show_help(self):
-        text = read_help_text()
         win = tk.Toplevel(self)
         win.title("User Guide — Elite Dangerous Backup"); win.geometry("820x700"); win.minsize(640, 480)
 
@@ -230,13 +317,11 @@ class App(tk.Tk):
         ttk.Label(topbar, text=HELP_PATH).pack(side="right", padx=8)
 
         frame = ttk.Frame(win); frame.pack(fill="both", expand=True, padx=8, pady=8)
-        txt = tk.Text(frame, wrap="word", borderwidth=0, highlightthickness=0); txt.pack(side="left", fill="both", expand=True)
+        txt = self._make_text(frame, wrap="word", borderwidth=0, highlightthickness=0); txt.pack(side="left", fill="both", expand=True)
         sb = ttk.Scrollbar(frame, orient="vertical", command=txt.yview); sb.pack(side="right", fill="y")
         txt.configure(yscrollcommand=sb.set)
 
-        from markdown import render_markdown
-        render_markdown(txt, text)
-        apply_theme_to_toplevel(win)
+        render_markdown(txt, self._help_markdown())
 
     def _edit_help_file(self):
         ensure_help_file()
@@ -263,30 +348,72 @@ class App(tk.Tk):
         )
 
     # UI pump
-    def _poll_queue(self):
+    def _notify(self):
+        # called from worker threads; Tk queues the virtual event for the UI thread
         try:
-            while True:
-                msg_type, payload = self.ui_queue.get_nowait()
-                if msg_type == "log":
-                    self._log(payload)
-                elif msg_type == "progress":
-                    done, total = payload
-                    pct = 0 if total == 0 else int(done * 100 / total)
-                    self.progress["value"] = pct
-                elif msg_type == "done":
-                    self.btn_start.configure(state="normal"); self.btn_cancel.configure(state="disabled")
-                    out = payload; self._log(f"Finished. Output:\n{out}")
-                    messagebox.showinfo("Backup Complete", f"Backup finished.\n\nOutput:\n{out}")
-                elif msg_type == "failed":
-                    self.btn_start.configure(state="normal"); self.btn_cancel.configure(state="disabled")
-                    err = payload; messagebox.showerror("Backup Failed", f"An error occurred:\n\n{err}")
-                elif msg_type == "cancelled":
-                    self.btn_start.configure(state="normal"); self.btn_cancel.configure(state="disabled")
-                    self._log("Cancelled."); messagebox.showinfo("Cancelled", "Backup cancelled.")
-        except queue.Empty:
-            pass
-        self.after(100, self._poll_queue)
+            self.event_generate("<<BackupMsg>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # window closing / mainloop gone; the safety timer drains what's left
+
+    def _post(self, msg_type, payload):
+        self.ui_queue.append((msg_type, payload)); self._notify()
+
+    def _poll_queue(self):
+        self._drain_queue()
+        self.after(POLL_SAFETY_MS, self._poll_queue)
+
+    def _drain_queue(self):
+        # drain everything queued so far: log lines go into the widget
+        # with one insert and only the latest progress value is applied
+        lines = []; progress = None
+        q = self.ui_queue
+        while q:
+            msg_type, payload = q.popleft()
+            if msg_type == "log":
+                lines.append(payload)
+            elif msg_type == "log_batch":
+                lines.extend(payload)
+            elif msg_type == "progress":
+                progress = payload
+            elif msg_type == "drives":
+                self._show_drives(payload)
+            else:
+                if lines: self._log("\n".join(lines)); lines = []
+                if progress: self._show_progress(*progress); progress = None
+                self._finish_run(msg_type, payload)
+        if lines: self._log("\n".join(lines))
+        if progress: self._show_progress(*progress)
+
+    def _finish_run(self, msg_type, payload):
+        self.btn_start.configure(state="normal"); self.btn_cancel.configure(state="disabled")
+        if msg_type == "done":
+            self._show_progress(1, 1)  # full, determinate: also stops the indeterminate bar of an empty run
+            self._remember_last_run()
+            out = payload; self._log(f"Finished. Output:\n{out}")
+            messagebox.showinfo("Backup Complete", f"Backup finished.\n\nOutput:\n{out}")
+        elif msg_type == "failed":
+            self._show_progress(0, 100)
+            err = payload; messagebox.showerror("Backup Failed", f"An error occurred:\n\n{err}")
+        elif msg_type == "cancelled":
+            self._show_progress(0, 100)
+            self._log("Cancelled."); messagebox.showinfo("Cancelled", "Backup cancelled.")
+
+    def _show_progress(self, done, total):
+        # total 0: not known yet (first run, scan still going) -> indeterminate bar
+        indeterminate = str(self.progress["mode"]) == "indeterminate"
+        if not total:
+            if not indeterminate:
+                self.progress.configure(mode="indeterminate"); self.progress.start(50); self._last_pct = -1
+            return
+        if indeterminate:
+            self.progress.stop(); self.progress.configure(mode="determinate")
+        pct = int(done * 100 / total)
+        if pct != self._last_pct:  # same percentage: skip the redraw
+            self.progress["value"] = self._last_pct = pct
 
     def _log(self, text):
         self.log_text.insert("end", text + "\n")
+        lines = int(self.log_text.index("end-1c").split(".")[0])
+        if lines > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{lines - LOG_MAX_LINES + 1}.0")
         self.log_text.see("end")
@@ -1,65 +1,240 @@
 import ctypes
 import os
 import sys
+import threading
+import time
 from ctypes import wintypes
 
+_IS_WIN32 = sys.platform == "win32"
+
+# DLLs and entry points are looked up once, here; the functions below call the bound pointers
+if _IS_WIN32:
+    # use_last_error: ctypes saves GetLastError() right after each call, so WinError reports the
+    # failing call's code rather than whatever the interpreter did in between
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    try:
+        _shcore = ctypes.WinDLL("shcore", use_last_error=True)
+    except OSError:  # before Windows 8.1
+        _shcore = None
+    try:
+        _pathcch = ctypes.WinDLL("api-ms-win-core-path-l1-1-0")
+    except OSError:  # before Windows 8
+        _pathcch = None
+
+    def _bind(dll, name, argtypes, restype):
+        fn = getattr(dll, name, None)
+        if fn is not None:
+            fn.argtypes = argtypes; fn.restype = restype
+        return fn
+
+    _SetProcessDpiAwarenessContext = _bind(_user32, "SetProcessDpiAwarenessContext", [ctypes.c_void_p], wintypes.BOOL)
+    # returns an HRESULT; kept as a plain long so E_ACCESSDENIED can be told apart from real failures
+    _SetProcessDpiAwareness = _bind(_shcore, "SetProcessDpiAwareness", [ctypes.c_int], ctypes.c_long)
+    _SetProcessDPIAware = _bind(_user32, "SetProcessDPIAware", [], wintypes.BOOL)
+
+    GetLogicalDrives = _bind(_kernel32, "GetLogicalDrives", [], wintypes.DWORD)
+    GetDriveTypeW = _bind(_kernel32, "GetDriveTypeW", [wintypes.LPCWSTR], wintypes.UINT)
+    _PathCchCanonicalizeEx = _bind(_pathcch, "PathCchCanonicalizeEx",
+                                   [wintypes.LPWSTR, ctypes.c_size_t, wintypes.LPCWSTR, wintypes.ULONG], ctypes.HRESULT)
+    GetFullPathNameW = _bind(_kernel32, "GetFullPathNameW", [wintypes.LPCWSTR, wintypes.DWORD, wintypes.LPWSTR,
+                                                             ctypes.POINTER(wintypes.LPWSTR)], wintypes.DWORD)
+    CopyFileExW = _bind(_kernel32, "CopyFileExW", [wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p, ctypes.c_void_p,
+                                                   ctypes.POINTER(wintypes.BOOL), wintypes.DWORD], wintypes.BOOL)
+
+    # hidden window + message loop, for WM_DEVICECHANGE
+    LRESULT = ctypes.c_ssize_t
+    WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+    class WNDCLASSW(ctypes.Structure):
+        _fields_ = [("style", wintypes.UINT), ("lpfnWndProc", WNDPROC), ("cbClsExtra", ctypes.c_int),
+                    ("cbWndExtra", ctypes.c_int), ("hInstance", wintypes.HINSTANCE), ("hIcon", wintypes.HICON),
+                    ("hCursor", wintypes.HANDLE), ("hbrBackground", wintypes.HBRUSH),
+                    ("lpszMenuName", wintypes.LPCWSTR), ("lpszClassName", wintypes.LPCWSTR)]
+
+    GetModuleHandleW = _bind(_kernel32, "GetModuleHandleW", [wintypes.LPCWSTR], wintypes.HMODULE)
+    RegisterClassW = _bind(_user32, "RegisterClassW", [ctypes.POINTER(WNDCLASSW)], wintypes.ATOM)
+    CreateWindowExW = _bind(_user32, "CreateWindowExW",
+                            [wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_int,
+                             ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.HWND, wintypes.HMENU,
+                             wintypes.HINSTANCE, wintypes.LPVOID], wintypes.HWND)
+    DefWindowProcW = _bind(_user32, "DefWindowProcW",
+                           [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM], LRESULT)
+    GetMessageW = _bind(_user32, "GetMessageW", [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT,
+                                                 wintypes.UINT], wintypes.BOOL)
+    TranslateMessage = _bind(_user32, "TranslateMessage", [ctypes.POINTER(wintypes.MSG)], wintypes.BOOL)
+    DispatchMessageW = _bind(_user32, "DispatchMessageW", [ctypes.POINTER(wintypes.MSG)], LRESULT)
+
 # DPI
+E_ACCESSDENIED = -0x7FF8FFFB  # 0x80070005 as a signed HRESULT: awareness already set (e.g. by the manifest)
+# (function, args, succeeded(result)) in order of preference
+_DPI_CALLS = ()
+_dpi_done = False
+if _IS_WIN32:
+    _DPI_CALLS = tuple(c for c in (
+        # PER_MONITOR_AWARE_V2 needs Windows 10 1703; PER_MONITOR_AWARE and SYSTEM_AWARE work since 1607
+        (_SetProcessDpiAwarenessContext, (ctypes.c_void_p(-4),), bool),
+        (_SetProcessDpiAwarenessContext, (ctypes.c_void_p(-3),), bool),
+        (_SetProcessDpiAwarenessContext, (ctypes.c_void_p(-2),), bool),
+        (_SetProcessDpiAwareness, (2,), lambda hr: hr >= 0 or hr == E_ACCESSDENIED),  # PROCESS_PER_MONITOR_DPI_AWARE
+        (_SetProcessDPIAware, (), bool),
+    ) if c[0] is not None)
+
 def enable_high_dpi():
-    if sys.platform != "win32":
+    global _dpi_done
+    if _dpi_done:
         return
-    try:
-        user32 = ctypes.windll.user32
-        DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = ctypes.c_void_p(-4)
-        if hasattr(user32, "SetProcessDpiAwarenessContext"):
-            if user32.SetProcessDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2):
+    _dpi_done = True
+    for fn, args, succeeded in _DPI_CALLS:
+        try:
+            if succeeded(fn(*args)):
                 return
-    except Exception:
-        pass
-    try:
-        shcore = getattr(ctypes.windll, "shcore", None)
-        if shcore and hasattr(shcore, "SetProcessDpiAwareness"):
-            shcore.SetProcessDpiAwareness(2)
-            return
-    except Exception:
-        pass
-    try:
-        user32 = ctypes.windll.user32
-        if hasattr(user32, "SetProcessDPIAware"):
-            user32.SetProcessDPIAware()
-    except Exception:
-        pass
+        except Exception:
+            pass
 
 # Drives
 DRIVE_REMOVABLE = 2
-if sys.platform == "win32":
-    GetLogicalDrives = ctypes.windll.kernel32.GetLogicalDrives
-    GetDriveTypeW = ctypes.windll.kernel32.GetDriveTypeW
-    GetDriveTypeW.argtypes = [wintypes.LPCWSTR]
-    GetDriveTypeW.restype = wintypes.UINT
+_DRIVE_LETTERS = tuple(f"{chr(65 + i)}:\\" for i in range(26))  # bit i of the GetLogicalDrives mask
+WM_DEVICECHANGE = 0x0219
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+
+# GetDriveTypeW is a driver round-trip per letter (slow on a sick USB stick);
+# removable-drive lookups in quick succession share one enumeration
+DRIVES_TTL = 2.0
+_removable_cache = (float("-inf"), [])
 
 def list_drives():
-    if sys.platform != "win32":
-        return []
     drives = []
     bitmask = GetLogicalDrives()
-    for i in range(26):
-        if bitmask & (1 << i):
-            letter = f"{chr(ord('A') + i)}:\\"
-            dtype = GetDriveTypeW(letter)
-            drives.append((letter, dtype))
+    while bitmask:  # visit set bits only, lowest (A:) first
+        low = bitmask & -bitmask
+        letter = _DRIVE_LETTERS[low.bit_length() - 1]
+        drives.append((letter, GetDriveTypeW(letter)))
+        bitmask ^= low
     return drives
 
+def invalidate_drives_cache():
+    global _removable_cache
+    _removable_cache = (float("-inf"), [])
+
 def list_removable_drives():
-    if sys.platform != "win32":
-        return []
-    return [d for d, t in list_drives() if t == DRIVE_REMOVABLE]
+    # same scan as list_drives, filtered in the loop: no (letter, type) list to build and throw away
+    drives = []
+    bitmask = GetLogicalDrives()
+    while bitmask:
+        low = bitmask & -bitmask
+        letter = _DRIVE_LETTERS[low.bit_length() - 1]
+        if GetDriveTypeW(letter) == DRIVE_REMOVABLE:
+            drives.append(letter)
+        bitmask ^= low
+    return drives
+
+def list_removable_drives_cached(max_age=DRIVES_TTL):
+    """list_removable_drives(), reusing a scan made within max_age seconds."""
+    global _removable_cache
+    now = time.monotonic()
+    ts, cached = _removable_cache
+    if now - ts >= max_age:
+        cached = list_removable_drives()
+        _removable_cache = (now, cached)
+    return list(cached)
+
+_device_watcher = None
+
+def watch_device_changes(on_change=None):
+    """
+    Start (once) a hidden window on a daemon thread that clears the drive
+    caches when a volume arrives or goes away, then calls on_change() from
+    that thread. Returns the watcher thread.
+    """
+    global _device_watcher
+    if _device_watcher is None:
+        _device_watcher = threading.Thread(target=_device_pump, args=(on_change,), name="device-watch", daemon=True)
+        _device_watcher.start()
+    return _device_watcher
+
+def _device_pump(on_change):
+    def proc(hwnd, msg, wparam, lparam):
+        if msg == WM_DEVICECHANGE and wparam in (DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE):
+            invalidate_drives_cache()
+            if on_change is not None:
+                try:
+                    on_change()
+                except Exception:
+                    pass
+            return 1
+        return DefWindowProcW(hwnd, msg, wparam, lparam)
+
+    wc = WNDCLASSW(lpfnWndProc=WNDPROC(proc), hInstance=GetModuleHandleW(None),
+                   lpszClassName="EliteDangerousBackupDeviceWatch")
+    if not RegisterClassW(ctypes.byref(wc)):
+        return
+    # a hidden top-level window rather than HWND_MESSAGE: message-only windows
+    # don't receive the broadcast DBT_DEVICEARRIVAL / DBT_DEVICEREMOVECOMPLETE
+    if not CreateWindowExW(0, wc.lpszClassName, None, 0, 0, 0, 0, 0, None, None, wc.hInstance, None):
+        return
+    msg = wintypes.MSG()
+    while GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+        TranslateMessage(ctypes.byref(msg)); DispatchMessageW(ctypes.byref(msg))
+
+# Copy
+def copy_file_ex(src: str, dst: str):
+    # Kernel-side copy (no userspace buffer); also carries timestamps and attributes
+    if not CopyFileExW(src, dst, None, None, None, 0):
+        raise ctypes.WinError(ctypes.get_last_error())
 
 # Long path helper
+PATHCCH_ALLOW_LONG_PATHS = 0x01
+_tls = threading.local()  # per-thread "\\?\" + 32K-char output buffer for GetFullPathNameW
+
+def _long_full_path(p):
+    # "\\?\" + abspath(p), minus ntpath's Python-level work and the concatenation: the prefix
+    # sits in the reused buffer's first 4 slots and GetFullPathNameW writes right after it
+    buf = getattr(_tls, "buf", None)
+    if buf is None:
+        buf = _tls.buf = ctypes.create_unicode_buffer(4 + 32768)
+        buf[:4] = "\\\\?\\"
+        _tls.out = ctypes.cast(ctypes.byref(buf, 4 * ctypes.sizeof(ctypes.c_wchar)), wintypes.LPWSTR)
+    n = GetFullPathNameW(p, len(buf) - 4, _tls.out, None)
+    if not 0 < n < len(buf) - 4:
+        full = os.path.abspath(p)
+        return full if full[:2] == "\\\\" else "\\\\?\\" + full
+    return buf[4:4 + n] if buf[4:6] == "\\\\" else buf[:4 + n]  # UNC results stay unprefixed
+
+def _canonical_long(p):
+    # \\?\ paths skip Win32 normalization ('/', '.', '..'), so the path must be canonical already
+    if _PathCchCanonicalizeEx is not None:
+        buf = ctypes.create_unicode_buffer(len(p) + 16)  # canonical form + "\\?\UNC\" never exceeds this
+        try:
+            _PathCchCanonicalizeEx(buf, len(buf), p.replace("/", "\\"), PATHCCH_ALLOW_LONG_PATHS)
+        except OSError:
+            pass
+        else:
+            out = buf.value  # prefixed by the API only when it still exceeds MAX_PATH
+            return out if out[:2] == "\\\\" else "\\\\?\\" + out
+    return "\\\\?\\" + os.path.normpath(p)
+
 def win_longpath(p: str) -> str:
-    if sys.platform != "win32":
+    if len(p) < 240 or p[:2] == "\\\\":  # short, or already \\?\ / UNC
         return p
-    if p.startswith("\\\\?\\") or p.startswith("\\\\"):
+    if p[1:3] in (":\\", ":/"):
+        return _canonical_long(p)  # only needs canonicalizing, no current-directory lookup
+    return _long_full_path(p)  # GetFullPathNameW also folds '/', '.' and '..'
+
+if not _IS_WIN32:
+    # nothing to do off Windows: trivial versions replace the ones above, so callers pay no platform check
+    def enable_high_dpi():
+        pass
+
+    def list_drives():
+        return []
+
+    def list_removable_drives():
+        return []
+
+    def watch_device_changes(on_change=None):
+        return None
+
+    def win_longpath(p: str) -> str:
         return p
-    if len(p) >= 240:
-        return "\\\\?\\" + os.path.abspath(p)
-    return p